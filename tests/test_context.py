@@ -0,0 +1,58 @@
+import pytest
+
+from weirb_hrpc.context import Context
+from weirb_hrpc.error import DependencyError
+
+
+def test_require_config():
+    ctx = Context({'config.debug': True}, [])
+    assert ctx.require('config.debug') is True
+
+
+def test_require_missing():
+    ctx = Context({'config.debug': True}, [])
+    with pytest.raises(DependencyError):
+        ctx.require('config.port')
+    with pytest.raises(DependencyError):
+        ctx.require('db')
+
+
+def test_provide():
+    ctx = Context({}, [])
+    ctx.provide('db', 'DB')
+    assert ctx.require('db') == 'DB'
+
+
+def test_provide_lazy():
+    calls = []
+
+    def get_db():
+        calls.append(1)
+        return 'DB'
+
+    ctx = Context({}, [])
+    ctx.provide('db', get_db, lazy=True)
+    assert not calls
+    assert ctx.require('db') == 'DB'
+    assert ctx.require('db') == 'DB'
+    assert len(calls) == 1
+
+
+def test_provide_lazy_override_eager():
+    ctx = Context({}, [])
+    ctx.provide('db', 'eager')
+    ctx.provide('db', lambda: 'lazy', lazy=True)
+    assert ctx.require('db') == 'lazy'
+
+
+def test_provide_eager_override_lazy():
+    ctx = Context({}, [])
+    ctx.provide('db', lambda: 'lazy', lazy=True)
+    ctx.provide('db', 'eager')
+    assert ctx.require('db') == 'eager'
+
+
+def test_provide_not_override_config():
+    ctx = Context({'config.debug': True}, [])
+    ctx.provide('config.debug', False)
+    assert ctx.require('config.debug') is True
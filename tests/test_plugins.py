@@ -0,0 +1,138 @@
+import itertools
+import textwrap
+
+import pytest
+
+from weirb_hrpc.app import App, _plugin_deps, _sort_plugins
+from weirb_hrpc.error import DependencyError
+
+PLUGIN_SOURCE = '''
+class Plugin:
+    def __init__(self, name, provides=None, requires=None):
+        self.name = name
+        self.provides = provides
+        self.requires = requires
+
+    def __repr__(self):
+        return self.name
+
+    def active(self, app):
+        pass
+'''
+
+_app_ids = itertools.count()
+
+
+class Plugin:
+    def __init__(self, name, provides=None, requires=None):
+        self.name = name
+        self.provides = provides
+        self.requires = requires
+
+    def __repr__(self):
+        return self.name
+
+
+def _sort(plugins, provides=()):
+    items = [(p, *_plugin_deps(p)) for p in plugins]
+    return [p.name for p, _, _ in _sort_plugins(items, set(provides))]
+
+
+def test_sort_plugins_keep_order():
+    a, b, c = Plugin('a'), Plugin('b'), Plugin('c')
+    assert _sort([a, b, c]) == ['a', 'b', 'c']
+
+
+def test_sort_plugins_provider_first():
+    a = Plugin('a', requires=['db'])
+    b = Plugin('b', provides=['db'])
+    c = Plugin('c')
+    assert _sort([a, b, c]) == ['b', 'a', 'c']
+
+
+def test_sort_plugins_chain():
+    a = Plugin('a', requires=['y'])
+    b = Plugin('b', provides=['y'], requires=['x'])
+    c = Plugin('c', provides=['x'])
+    assert _sort([a, b, c]) == ['c', 'b', 'a']
+
+
+def test_sort_plugins_config_provides():
+    a = Plugin('a', requires=['config.debug'])
+    b = Plugin('b')
+    assert _sort([a, b], {'config.debug'}) == ['a', 'b']
+
+
+def test_sort_plugins_none_attributes():
+    a = Plugin('a', provides=None, requires=None)
+    assert _sort([a]) == ['a']
+
+
+def test_sort_plugins_self_requires():
+    a = Plugin('a', provides=['db'], requires=['db'])
+    assert _sort([a]) == ['a']
+
+
+def test_sort_plugins_duplicate_instance():
+    a = Plugin('a', requires=['db'])
+    b = Plugin('b', provides=['db'])
+    assert _sort([a, b, a]) == ['b', 'a', 'a']
+
+
+def test_sort_plugins_missing():
+    a = Plugin('a', requires=['db'])
+    with pytest.raises(DependencyError) as exinfo:
+        _sort([a])
+    assert 'db' in str(exinfo.value)
+
+
+def test_sort_plugins_cycle():
+    a = Plugin('a', provides=['x'], requires=['y'])
+    b = Plugin('b', provides=['y'], requires=['x'])
+    c = Plugin('c', requires=['x'])
+    d = Plugin('d')
+    with pytest.raises(DependencyError) as exinfo:
+        _sort([a, b, c, d])
+    message = str(exinfo.value)
+    assert message.startswith('plugins a, b, c are blocked')
+    assert 'circular' in message
+
+
+@pytest.fixture
+def create_app(tmp_path, monkeypatch):
+    monkeypatch.syspath_prepend(str(tmp_path))
+
+    def create(config_source):
+        name = f'plugin_app_{next(_app_ids)}'
+        package = tmp_path / name
+        package.mkdir()
+        (package / '__init__.py').write_text('')
+        source = PLUGIN_SOURCE + textwrap.dedent(config_source)
+        (package / 'config.py').write_text(source)
+        return App(name)
+
+    return create
+
+
+def test_active_plugins(create_app):
+    app = create_app('''
+        plugins = [
+            Plugin('a', requires=['db']),
+            Plugin('b', provides=['db'], requires=['config.debug']),
+        ]
+    ''')
+    assert [p.name for p in app.plugins] == ['b', 'a']
+    assert 'db' in app.provides
+    assert app.contexts == ()
+
+
+def test_active_plugins_changed_provides(create_app):
+    with pytest.raises(DependencyError) as exinfo:
+        create_app('''
+            class LazyPlugin(Plugin):
+                def active(self, app):
+                    self.provides = ['db']
+
+            plugins = [Plugin('a'), LazyPlugin('b')]
+        ''')
+    assert 'changed' in str(exinfo.value)
@@ -0,0 +1,30 @@
+from weirb_hrpc import router
+from weirb_hrpc.router import Router
+
+
+class Method:
+    def __init__(self, name):
+        self.name = name
+        self.is_http_request = False
+
+
+class Service:
+    def __init__(self, name, methods):
+        self.name = name
+        self.methods = [Method(m) for m in methods]
+
+
+def test_lookup():
+    r = Router([Service('Echo', ['echo'])])
+    method = r.lookup('POST', '/Echo/Echo')
+    assert method.name == 'echo'
+    assert r.lookup('POST', '/echo/ECHO') is method
+
+
+def test_lookup_cache_full(monkeypatch):
+    monkeypatch.setattr(router, 'ROUTE_CACHE_SIZE', 2)
+    r = Router([Service('Echo', ['echo'])])
+    r.lookup('POST', '/Echo/Echo')
+    r.lookup('POST', '/ECHO/echo')
+    r.lookup('POST', '/echo/echo')
+    assert list(r._cache) == [('POST', '/echo/echo')]
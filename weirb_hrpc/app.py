@@ -1,10 +1,14 @@
 import os
-import inspect
+import sys
 import logging
+import heapq
 from importlib import import_module
 
-import toml
-from terminaltables import SingleTable
+try:
+    import tomllib
+except ImportError:
+    import tomli as tomllib
+
 from validr import modelclass, Invalid, Compiler, fields, asdict
 from weirb import run
 from weirb import Request as HttpRequest
@@ -21,17 +25,38 @@ from .router import Router
 
 LOG = logging.getLogger(__name__)
 
+# compiled schemas are reusable across App instances which share the same
+# validators and config bases, eg: CLI commands and tests
+_SCHEMA_COMPILER_CACHE = {}
+_CONFIG_CLASS_CACHE = {}
+_SERVER_CONFIG_FIELDS = tuple(fields(ServerConfig))
+
+# service classes by import name, with the root module they found from
+_SERVICES_CACHE = {}
+
+# the fallback error response is stateless, encode it once and only
+# create a new http response from it per request
+_INTERNAL_ERROR_HTTP = ErrorResponse(InternalError()).to_http_factory()
+
 
 class App:
     def __init__(self, import_name, **cli_config):
         self.import_name = import_name
+        name = import_name.replace('.', '_')
+        self._env_config_key = f'{name}_config'.upper()
         self._load_config_module()
         self._load_intro()
         self._load_plugins()
         self._load_schema_compiler()
         self._load_config_class()
         self._load_config(cli_config)
+        self._config_field_keys = tuple(fields(self.config))
         self._config_dict = asdict(self.config)
+        self._config_keyed = {
+            f'config.{k}': v for k, v in self._config_dict.items()}
+        self._server_config_dict = {
+            k: self._config_dict[k] for k in _SERVER_CONFIG_FIELDS
+            if k in self._config_dict}
         self._active_plugins()
         self._load_services()
         self.router = Router(self.services, self.config.url_prefix)
@@ -40,14 +65,9 @@ class App:
         return f'<App {self.import_name}>'
 
     def _load_config_module(self):
-        self.config_module = None
-        try:
-            self.config_module = import_module(f'{self.import_name}.config')
-        except ImportError:
-            try:
-                self.config_module = import_module(self.import_name)
-            except ImportError:
-                pass
+        self.config_module = _safe_import(f'{self.import_name}.config')
+        if self.config_module is None:
+            self.config_module = _safe_import(self.import_name)
 
     def _load_intro(self):
         if hasattr(self.config_module, 'intro'):
@@ -65,7 +85,18 @@ class App:
         self.validators = INTERNAL_VALIDATORS.copy()
         if hasattr(self.config_module, 'validators'):
             self.validators.update(self.config_module.validators)
-        self.schema_compiler = Compiler(self.validators)
+        try:
+            self._validators_key = frozenset(self.validators.items())
+        except TypeError:
+            # unhashable validators, skip the caches
+            self._validators_key = None
+            self.schema_compiler = Compiler(self.validators)
+            return
+        compiler = _SCHEMA_COMPILER_CACHE.get(self._validators_key)
+        if compiler is None:
+            compiler = Compiler(self.validators)
+            _SCHEMA_COMPILER_CACHE[self._validators_key] = compiler
+        self.schema_compiler = compiler
 
     def _load_config_class(self):
         """
@@ -78,31 +109,38 @@ class App:
         for plugin in self.plugins:
             if hasattr(plugin, 'Config'):
                 configs.append(plugin.Config)
-        config_class = type('Config', tuple(configs), {})
-        self.config_class = modelclass(
-            config_class, compiler=self.schema_compiler, immutable=True)
+        configs = tuple(configs)
+        key = None
+        if self._validators_key is not None:
+            key = (configs, self._validators_key)
+        config_class = _CONFIG_CLASS_CACHE.get(key)
+        if config_class is None:
+            config_class = type('Config', configs, {})
+            config_class = modelclass(
+                config_class, compiler=self.schema_compiler, immutable=True)
+            if key is not None:
+                _CONFIG_CLASS_CACHE[key] = config_class
+        self.config_class = config_class
 
     def _load_config(self, cli_config):
-        name = self.import_name.replace('.', '_')
-        key = f'{name}_config'.upper()
-        config_path = os.getenv(key, None)
+        config_path = os.environ.get(self._env_config_key)
         if config_path:
             print(f'* Load config file {config_path!r}')
             try:
-                with open(config_path) as f:
-                    content = f.read()
+                f = open(config_path, 'rb')
             except FileNotFoundError:
                 msg = f'config file {config_path!r} not found'
                 raise ConfigError(msg) from None
-            try:
-                config = toml.loads(content)
-            except toml.TomlDecodeError:
-                msg = f'config file {config_path!r} is not valid TOML file'
-                raise ConfigError(msg) from None
+            with f:
+                try:
+                    config = tomllib.load(f)
+                except (tomllib.TOMLDecodeError, UnicodeDecodeError):
+                    msg = f'config file {config_path!r} is not valid TOML file'
+                    raise ConfigError(msg) from None
             config.update(cli_config)
         else:
             print(f'* No config file provided, you can set config path'
-                  f' by {key} environment variable')
+                  f' by {self._env_config_key} environment variable')
             config = cli_config
         try:
             self.config = self.config_class(**config)
@@ -110,41 +148,64 @@ class App:
             raise ConfigError(ex.message) from None
 
     def _active_plugins(self):
+        """
+        Plugins are sorted by their provides and requires before actived,
+        so both must be static attributes, they can not be changed in
+        plugin.active(app).
+        """
         self.contexts = []
         self.decorators = []
-        self.provides = {f'config.{key}' for key in fields(self.config)}
-        for plugin in self.plugins:
+        self.provides = {f'config.{k}' for k in self._config_field_keys}
+        self._plugin_rows = []
+        items = [(p, *_plugin_deps(p)) for p in self.plugins]
+        items = _sort_plugins(items, self.provides)
+        self.plugins = [plugin for plugin, _, _ in items]
+        for plugin, provides, requires in items:
             plugin.active(self)
-            if hasattr(plugin, 'context'):
-                self.contexts.append(plugin.context)
-            if hasattr(plugin, 'decorator'):
-                self.decorators.append(plugin.decorator)
-            if hasattr(plugin, 'provides'):
-                self.provides.update(plugin.provides)
-        for plugin in self.plugins:
-            if not hasattr(plugin, 'requires'):
-                continue
-            requires = set(plugin.requires)
-            missing = ', '.join(requires - self.provides)
-            if missing:
-                msg = f'the requires {missing} of plugin {plugin} is missing'
+            if _plugin_deps(plugin) != (provides, requires):
+                msg = (f'the provides or requires of plugin {plugin} '
+                       'changed when active')
                 raise DependencyError(msg)
+            contributes = []
+            context = getattr(plugin, 'context', None)
+            if context is not None:
+                self.contexts.append(context)
+                contributes.append('context')
+            decorator = getattr(plugin, 'decorator', None)
+            if decorator is not None:
+                self.decorators.append(decorator)
+                contributes.append('decorator')
+            self.provides.update(provides)
+            self._plugin_rows.append((
+                type(plugin).__name__,
+                ', '.join(provides),
+                ', '.join(requires),
+                ', '.join(contributes),
+            ))
+        # contexts are fixed after plugins actived
+        self.contexts = tuple(self.contexts)
 
     def _load_services(self):
-        service_classes = set(_import_services(self.import_name))
+        service_classes = dict.fromkeys(
+            _import_services_cached(self.import_name))
         self.services = []
+        self._service_rows = []
         for cls in service_classes:
             s = Service(
                 cls, self.provides, self.decorators, self.schema_compiler)
             self.services.append(s)
+            methods = ', '.join(m.name for m in s.methods)
+            requires = ', '.join(f.key for f in s.fields.values())
+            self._service_rows.append((s.name, methods, requires))
 
     def context(self):
-        return Context(self._config_dict, self.contexts, self._handler)
+        return Context(self._config_keyed, self.contexts, self._handler)
 
     async def _handler(self, context, raw_request):
         http_request = HttpRequest(raw_request)
         try:
-            method = self.router.lookup(http_request.method, http_request.path)
+            http_method, path = http_request.method, http_request.path
+            method = self.router.lookup(http_method, path)
             http_response = await method(context, http_request)
         except HrpcError as ex:
             http_response = ErrorResponse(ex).to_http()
@@ -152,7 +213,7 @@ class App:
             raise
         except Exception as ex:
             LOG.error('Error raised when handle request:', exc_info=ex)
-            http_response = ErrorResponse(InternalError()).to_http()
+            http_response = _INTERNAL_ERROR_HTTP()
         return http_response
 
     def run(self):
@@ -162,62 +223,118 @@ class App:
             self.print_plugin()
         if self.config.print_service:
             self.print_service()
-        server_config = asdict(self.config, keys=fields(ServerConfig))
-        run(self, **server_config)
+        run(self, **self._server_config_dict)
 
     def print_config(self):
+        from terminaltables import SingleTable
         table = [('Key', 'Value', 'Schema')]
         config_schema = self.config.__schema__.items
-        for key, value in sorted(asdict(self.config).items()):
+        for key, value in sorted(self._config_dict.items()):
             schema = config_schema[key]
-            table.append(
-                (key, _shorten(str(value)), _shorten(schema.repr()))
-            )
+            if not isinstance(value, str):
+                value = str(value)
+            table.append((key, _shorten(value), _shorten(schema.repr())))
         table = SingleTable(table, title='Configs')
         print(table.table)
 
     def print_plugin(self):
+        from terminaltables import SingleTable
         title = 'Plugins' if self.plugins else 'No plugins'
         table = [('#', 'Name', 'Provides', 'Requires', 'Contributes')]
-        for idx, plugin in enumerate(self.plugins, 1):
-            name = type(plugin).__name__
-            contributes = []
-            provides = ''
-            requires = ''
-            if hasattr(plugin, 'context'):
-                contributes.append('context')
-            if hasattr(plugin, 'decorator'):
-                contributes.append('decorator')
-            contributes = ', '.join(contributes)
-            if hasattr(plugin, 'provides'):
-                provides = ', '.join(plugin.provides)
-            if hasattr(plugin, 'requires'):
-                requires = ', '.join(plugin.requires)
-            table.append((idx, name, provides, requires, contributes))
+        for idx, row in enumerate(self._plugin_rows, 1):
+            table.append((idx, *row))
         table = SingleTable(table, title=title)
         print(table.table)
 
     def print_service(self):
+        from terminaltables import SingleTable
         title = 'Services' if self.services else 'No services'
         table = [('#', 'Name', 'Methods', 'Requires')]
-        for idx, service in enumerate(self.services, 1):
-            methods = [m.name for m in service.methods]
-            methods = ', '.join(methods)
-            requires = [field.key for field in service.fields.values()]
-            requires = ', '.join(requires)
-            table.append((idx, service.name, methods, requires))
+        for idx, row in enumerate(self._service_rows, 1):
+            table.append((idx, *row))
         table = SingleTable(table, title=title)
         print(table.table)
 
 
+def _plugin_deps(plugin):
+    provides = getattr(plugin, 'provides', None) or ()
+    requires = getattr(plugin, 'requires', None) or ()
+    return tuple(provides), tuple(requires)
+
+
+def _sort_plugins(items, provides):
+    """
+    Sort (plugin, provides, requires) items in topological order, providers
+    before consumers, otherwise plugins keep their configured order.
+    """
+    items = list(items)
+    providers = {}
+    for i, (_, plugin_provides, _) in enumerate(items):
+        for key in plugin_provides:
+            providers.setdefault(key, []).append(i)
+    consumers = [[] for _ in items]
+    indegree = [0] * len(items)
+    for i, (plugin, _, plugin_requires) in enumerate(items):
+        requires = set(plugin_requires) - provides
+        missing = ', '.join(sorted(k for k in requires if k not in providers))
+        if missing:
+            msg = f'the requires {missing} of plugin {plugin} is missing'
+            raise DependencyError(msg)
+        deps = {j for key in requires for j in providers[key]
+                if items[j][0] is not plugin}
+        for j in deps:
+            consumers[j].append(i)
+        indegree[i] = len(deps)
+    # always pick the first ready plugin to keep the configured order
+    ready = [i for i, n in enumerate(indegree) if n == 0]
+    result = []
+    while ready:
+        i = heapq.heappop(ready)
+        result.append(items[i])
+        for j in consumers[i]:
+            indegree[j] -= 1
+            if indegree[j] == 0:
+                heapq.heappush(ready, j)
+    if len(result) != len(items):
+        blocked = ', '.join(
+            str(item[0]) for item, n in zip(items, indegree) if n > 0)
+        msg = f'plugins {blocked} are blocked by circular requires'
+        raise DependencyError(msg)
+    return result
+
+
+def _safe_import(name):
+    module = sys.modules.get(name)
+    if module is not None:
+        return module
+    try:
+        return import_module(name)
+    except ImportError:
+        return None
+
+
 def _import_services(import_name):
     suffix = 'Service'
     for module in import_all_modules(import_name):
         for name, obj in vars(module).items():
             is_service = name != suffix and name.endswith(suffix)
-            if is_service and inspect.isclass(obj):
+            if is_service and isinstance(obj, type):
                 yield obj
 
 
+def _import_services_cached(import_name):
+    """
+    Services are cached with the root module, a reimported or removed
+    root module invalidates the cache.
+    """
+    root = sys.modules.get(import_name)
+    cached = _SERVICES_CACHE.get(import_name)
+    if root is not None and cached is not None and cached[0] is root:
+        return cached[1]
+    services = tuple(_import_services(import_name))
+    _SERVICES_CACHE[import_name] = (sys.modules.get(import_name), services)
+    return services
+
+
 def _shorten(x, w=30):
-    return (x[:w] + '...') if len(x) > w else x
+    return x if len(x) <= w else x[:w] + '...'
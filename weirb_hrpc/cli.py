@@ -4,7 +4,6 @@ import os.path
 import shutil
 from importlib import import_module
 from pathlib import Path
-from collections import deque
 
 import click
 
@@ -76,32 +75,27 @@ def _parse_config_options(tokens):
     """
     eg: ['--debug', '--port', '8899', 'xxx=yyy']
     """
-    tokens = deque(tokens)
     config = {}
     prev = None
-
-    def _take_prev():
-        nonlocal prev
-        if prev is not None:
-            config[prev] = True
-            prev = None
-
-    while tokens:
-        token = tokens.popleft()
-        if token.startswith('--'):
+    for token in tokens:
+        if token[:2] == '--':
             token = token[2:]
-            _take_prev()
-        parts = token.split('=', maxsplit=1)
-        if len(parts) == 2:
-            config[parts[0]] = parts[1]
-            _take_prev()
-        else:
             if prev is not None:
-                config[prev] = parts[0]
+                config[prev] = True
                 prev = None
-            else:
-                prev = parts[0]
-    _take_prev()
+        eq = token.find('=')
+        if eq >= 0:
+            config[token[:eq]] = token[eq + 1:]
+            if prev is not None:
+                config[prev] = True
+                prev = None
+        elif prev is not None:
+            config[prev] = token
+            prev = None
+        else:
+            prev = token
+    if prev is not None:
+        config[prev] = True
 
     config = {k.replace('-', '_'): v for k, v in config.items()}
     return config
@@ -113,9 +107,12 @@ def _create_app(ctx, name):
             name = get_current_app_name()
         except AppNotFound as ex:
             ctx.fail(str(ex))
-    sys.path.append(os.path.abspath(os.getcwd()))
+    cwd = os.path.abspath(os.getcwd())
+    if cwd not in sys.path:
+        sys.path.append(cwd)
     try:
-        import_module(name)
+        if name not in sys.modules:
+            import_module(name)
     except ModuleNotFoundError as ex:
         ctx.fail(f'App not found, {ex}')
     config = _parse_config_options(ctx.args)
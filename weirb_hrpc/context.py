@@ -1,30 +1,35 @@
 from .error import DependencyError
 
+_MISSING = object()
+_LAZY = object()
+
 
 class Context:
 
     def __init__(self, config, contexts, handler=None):
+        # config keys are prefixed with 'config.', eg: 'config.debug'
         self._config = config
-        self._contexts = [c(self) for c in contexts]
+        self._contexts = tuple([c(self) for c in contexts])
         self._handler = handler
+        # provided values and markers of lazy providers
         self._container = {}
         self._providers = {}
 
     def require(self, key):
-        if key.startswith('config.'):
-            config_key = key[7:]
-            if config_key not in self._config:
-                raise DependencyError(f'dependency {key!r} not exists')
-            return self._config[config_key]
-        if key not in self._container:
-            if key not in self._providers:
-                raise DependencyError(f'dependency {key!r} not exists')
-            self._container[key] = self._providers[key]()
-        return self._container[key]
+        value = self._config.get(key, _MISSING)
+        if value is not _MISSING:
+            return value
+        value = self._container.get(key, _MISSING)
+        if value is _MISSING:
+            raise DependencyError(f'dependency {key!r} not exists')
+        if value is _LAZY:
+            value = self._container[key] = self._providers[key]()
+        return value
 
     def provide(self, key, value, *, lazy=False):
         if lazy:
             self._providers[key] = value
+            self._container[key] = _LAZY
         else:
             self._container[key] = value
 
@@ -48,7 +53,8 @@ class Context:
                 break
         if error is not None:
             current_error = error
-            for ctx in reversed(self._contexts[:i]):
+            for j in range(i - 1, -1, -1):
+                ctx = self._contexts[j]
                 try:
                     ret = await ctx.athrow(current_error)
                 except StopAsyncIteration as stop:
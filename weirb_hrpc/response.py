@@ -1,4 +1,5 @@
 import json
+import functools
 from weirb import Response as HttpResponse
 
 
@@ -10,14 +11,27 @@ class Response:
             self.headers = headers
         self.result = result
 
-    def to_http(self, indent=4):
+    def _encode(self, indent):
         text = json.dumps(self.result, ensure_ascii=False, indent=indent)
-        response = HttpResponse(status=200, body=text.encode('utf-8'))
+        return text.encode('utf-8')
+
+    def _to_http(self, body):
+        response = HttpResponse(status=200, body=body)
         response.headers['Content-Type'] = 'application/json;charset=utf-8'
         for k, v in self.headers.items():
             response.headers[f'Hrpc-{k}'] = str(v)
         return response
 
+    def to_http(self, indent=4):
+        return self._to_http(self._encode(indent))
+
+    def to_http_factory(self, indent=4):
+        """
+        Return a function which creates http responses without encoding
+        the result again, the response must not be changed after that.
+        """
+        return functools.partial(self._to_http, self._encode(indent))
+
 
 class ErrorResponse(Response):
     def __init__(self, error, headers=None, data=None):
@@ -4,6 +4,8 @@ from .error import MethodNotFound
 
 LOG = logging.getLogger(__name__)
 
+ROUTE_CACHE_SIZE = 1024
+
 
 class Router:
     def __init__(self, services, url_prefix=''):
@@ -13,8 +15,22 @@ class Router:
             for m in s.methods:
                 methods[m.name.lower()] = m
         self.prefix = url_prefix.rstrip('/') + '/'
+        self._cache = {}
 
     def lookup(self, http_method, path):
+        key = (http_method, path)
+        service_method = self._cache.get(key)
+        if service_method is None:
+            service_method = self._lookup(http_method, path)
+            # only cache matched routes, paths of bad requests are unbounded.
+            # case variants of a route take their own slots, so start over
+            # when full instead of keeping the first routes forever
+            if len(self._cache) >= ROUTE_CACHE_SIZE:
+                self._cache.clear()
+            self._cache[key] = service_method
+        return service_method
+
+    def _lookup(self, http_method, path):
         path = path.lower()
         if not path.startswith(self.prefix):
             raise NotFound()